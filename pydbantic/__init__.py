@@ -2,6 +2,7 @@ from .core import (
     DataBaseModel,
     Default,
     ForeignKey,
+    Index,
     ModelField,
     PrimaryKey,
     Relationship,
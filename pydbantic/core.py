@@ -1,8 +1,8 @@
 import asyncio
-import importlib
-import sys
+import io
+import pickle
 import typing
-from pickle import dumps, loads
+from enum import Enum
 from typing import (
     Any,
     Awaitable,
@@ -36,14 +36,17 @@ from sqlalchemy import (
     String,
     Time,
     and_,
+    exists,
     func,
     or_,
     select,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Query, Session, relationship
 from sqlalchemy.sql.elements import UnaryExpression
 from sqlalchemy.sql.expression import delete
 from sqlalchemy.sql.functions import count
+from sqlalchemy.sql.util import find_tables
 from sqlalchemy.util.langhelpers import NoneType
 
 T = TypeVar("T")
@@ -93,6 +96,67 @@ class BaseMeta:
             tuple: sqlalchemy.LargeBinary,
         }
         self.tables: dict = {}
+        # type name -> class, None when a name is shared by multiple classes,
+        # also caches module.name paths resolved for untagged data
+        self.type_registry: dict = {}
+
+
+class RegistryPickler(pickle.Pickler):
+    """
+    tags registered types by name instead of module path, allowing
+    stored data to be decoded after the defining module is moved or renamed
+    """
+
+    def __init__(self, file, registry: dict):
+        super().__init__(file, protocol=pickle.DEFAULT_PROTOCOL)
+        self.registry = registry
+
+    def persistent_id(self, obj) -> Optional[str]:
+        if isinstance(obj, type) and self.registry.get(obj.__name__) is obj:
+            return obj.__name__
+        return None
+
+
+class RegistryUnpickler(pickle.Unpickler):
+    """
+    resolves type tags written by RegistryPickler, module paths of untagged
+    data are resolved once by import, falling back to a registered type
+    of the same name, then cached
+    """
+
+    def __init__(self, file, registry: dict):
+        super().__init__(file)
+        self.registry = registry
+
+    def persistent_load(self, type_tag: str) -> type:
+        if self.registry.get(type_tag) is None:
+            raise pickle.UnpicklingError(
+                f"type {type_tag} is not registered by any DataBaseModel field"
+            )
+        return self.registry[type_tag]
+
+    def find_class(self, module: str, name: str) -> Any:
+        path = f"{module}.{name}"
+        if path not in self.registry:
+            try:
+                self.registry[path] = super().find_class(module, name)
+            except (ImportError, AttributeError):
+                if self.registry.get(name) is None:
+                    raise
+                self.registry[path] = self.registry[name]
+        return self.registry[path]
+
+
+def get_annotation_types(annotation: Any) -> List[type]:
+    """
+    returns classes used within a field annotation, i.e Optional[List[Model]] -> [Model, NoneType]
+    """
+    if isinstance(annotation, type):
+        return [annotation]
+    types = []
+    for arg in getattr(annotation, "__args__", None) or ():
+        types.extend(get_annotation_types(arg))
+    return types
 
 
 def Relationship(
@@ -189,12 +253,24 @@ def Unique(
     )
 
 
+def Index(
+    sqlalchemy_type: Any = None, default=..., autoincrement: Optional[bool] = None
+) -> Any:
+    return get_field_config(
+        default=default,
+        index=True,
+        sqlalchemy_type=sqlalchemy_type,
+        autoincrement=autoincrement,
+    )
+
+
 def ModelField(
     sqlalchemy_type: Any = None,
     default=...,
     primary_key: Optional[bool] = None,
     unique: Optional[bool] = None,
     autoincrement: Optional[bool] = None,
+    index: Optional[bool] = None,
 ) -> Any:
     return get_field_config(
         default=default,
@@ -202,6 +278,7 @@ def ModelField(
         unique=unique,
         autoincrement=autoincrement,
         sqlalchemy_type=sqlalchemy_type,
+        index=index,
     )
 
 
@@ -211,6 +288,7 @@ def get_field_config(
     unique: Optional[bool] = None,
     sqlalchemy_type=None,
     autoincrement: Optional[bool] = None,
+    index: Optional[bool] = None,
     foreign_model: Any = None,
     foreign_model_key: Optional[str] = None,
     foreign_model_ondelete: Optional[str] = None,
@@ -227,6 +305,8 @@ def get_field_config(
         config["primary_key"] = primary_key
     if unique is not None:
         config["unique"] = unique
+    if index is not None:
+        config["index"] = index
     if sqlalchemy_type is not None:
         config["sqlalchemy_type"] = sqlalchemy_type
         is_sqlalchemy_supported_type(sqlalchemy_type)
@@ -348,7 +428,7 @@ class DataBaseModelAttribute:
             return getattr(value, primary_key)
 
         if self.serialized:
-            return dumps(value)
+            return self.table["model"].serialize_value(value)
 
         return value
 
@@ -424,6 +504,61 @@ class DataBaseModelAttribute:
             f"{self.name} not in {choices}", self.column.not_in(choices), tuple(choices)
         )
 
+    def check_column_type(self, *column_types) -> None:
+        if not isinstance(self.column.type, column_types):
+            raise Exception(
+                f"{self.name} is not a {' or '.join(t.__name__ for t in column_types)} column - "
+                f"native column types require Database(..., native_types=True)"
+            )
+
+    def has_key(self, key: str) -> DataBaseModelCondition:
+        """
+        JSONB only - rows where `key` exists at the top level of the column
+        """
+        self.check_column_type(JSONB)
+        return DataBaseModelCondition(
+            f"{self.name} has key {key}", self.column.has_key(key), (key,)
+        )
+
+    def contains_all(self, values: Union[dict, List[Any]]) -> DataBaseModelCondition:
+        """
+        JSONB / ARRAY - rows where column contains all of `values`, i.e `@>`
+        """
+        self.check_column_type(JSONB, ARRAY)
+        return DataBaseModelCondition(
+            f"{self.name} contains all {values}",
+            self.column.contains(values),
+            (values,),
+        )
+
+    def overlaps(self, values: List[Any]) -> DataBaseModelCondition:
+        """
+        ARRAY only - rows where column shares at least one item with `values`
+        """
+        self.check_column_type(ARRAY)
+        return DataBaseModelCondition(
+            f"{self.name} overlaps {values}",
+            self.column.overlap(values),
+            tuple(values),
+        )
+
+    def path(self, *keys: str, as_type: Any = None) -> "DataBaseModelAttribute":
+        """
+        JSONB only - returns an attribute for the text value found at `keys`,
+        usable with comparison operators, cast to `as_type` if provided
+        ```
+            await Model.filter(Model.data.path("address", "city") == "Boston")
+            await Model.filter(Model.data.path("age", as_type=Integer) > 30)
+        ```
+        """
+        self.check_column_type(JSONB)
+        column = self.column[keys].astext
+        if as_type is not None:
+            column = column.cast(as_type)
+        return DataBaseModelAttribute(
+            f"{self.name}.{'.'.join(keys)}", column, self.table
+        )
+
     def count(self) -> count:
         return count(self.column)
 
@@ -454,77 +589,53 @@ class DataBaseModel(BaseModel):
         return database_model
 
     @classmethod
-    def resolve_missing_module(cls, missing_error):
-        cls.__metadata__.database.log.warning(
-            f"detected {missing_error} - attempting to self correct"
-        )
-        missing_module = missing_error[38:-3]
-        module = importlib.new_module(missing_module)
-        sys.modules[missing_module] = module
-
-    @classmethod
-    def resolve_missing_attribute(cls, missing_error: str, expected_type=None):
-        cls.__metadata__.database.log.warning(
-            f"detected {missing_error} - attempting to self correct"
-        )
-        try:
-            missing_attr = (
-                "".join(
-                    missing_error.split("Can't get attribute")[1].split("on <module")
-                )
-                .split("from")[0]
-                .split(" ")[1][1:-1]
-            )
-
-            missing_mod = (
-                "".join(
-                    missing_error.split("Can't get attribute")[1].split("on <module")
-                )
-                .split("from")[0]
-                .split(" ")[3][1:-4]
-            )
+    def register_types(cls) -> None:
+        """
+        adds cls & the pydantic / Enum types used by its fields to the
+        database type_registry, used for tagging serialized column data
+        """
+        registry = cls.__metadata__.type_registry
+        to_register = [cls]
+        registered = set()
+        while to_register:
+            model = to_register.pop()
+            if model in registered:
+                continue
+            registered.add(model)
 
-            if not missing_mod in sys.modules:
-                mod = imp.new_module(missing_mod)
-            else:
-                mod = sys.modules[missing_mod]
+            if registry.get(model.__name__, model) is not model:
+                # name shared between classes, fallback to module path
+                registry[model.__name__] = None
+            elif model.__name__ not in registry:
+                registry[model.__name__] = model
 
-            if expected_type:
-                (missing_class,) = [
-                    v[1]
-                    for _, v in cls.__metadata__.tables[expected_type][
-                        "column_map"
-                    ].items()
-                    if hasattr(v[1], "__name__") and v[1].__name__ == missing_attr
-                ]
-            else:
-                missing_class = cls.__metadata__.tables[cls.__name__]["column_map"][
-                    missing_attr
-                ][1]
+            if not issubclass(model, BaseModel):
+                continue
+            for field in model.__fields__.values():
+                for field_type in get_annotation_types(field.outer_type_):
+                    if issubclass(field_type, (BaseModel, Enum)):
+                        to_register.append(field_type)
 
-            setattr(mod, missing_attr, missing_class)
-        except Exception:
-            raise Exception(
-                f"Failed to resolve {missing_error} with expected_type of {expected_type}"
-            )
+    @classmethod
+    def serialize_value(cls, value: Any) -> bytes:
+        buffer = io.BytesIO()
+        RegistryPickler(buffer, cls.__metadata__.type_registry).dump(value)
+        return buffer.getvalue()
 
     @classmethod
-    def deserialize(cls, data, expected_type=None):
-        while True:
-            try:
-                return loads(data) if data is not None else None
-            except AttributeError as e:
-                cls.resolve_missing_attribute(repr(e), expected_type=expected_type)
-            except ModuleNotFoundError as e:
-                cls.resolve_missing_module(repr(e))
-            except Exception as e:
-                raise e
+    def deserialize(cls, data: Optional[bytes]) -> Any:
+        if data is None:
+            return None
+        return RegistryUnpickler(
+            io.BytesIO(data), cls.__metadata__.type_registry
+        ).load()
 
     @classmethod
     def setup(cls, database):
         cls.__metadata__ = database.__metadata__
         cls.__tablename__ = getattr(cls, "__tablename__", cls.__name__)
         cls.update_backward_refs()
+        cls.register_types()
 
         if not hasattr(cls.__metadata__, "metadata"):
             cls.init_set_metadata(database.metadata)
@@ -556,16 +667,87 @@ class DataBaseModel(BaseModel):
 
         columns, link_tables = cls.convert_fields_to_columns()
 
+        existing_indexes = set()
+        if cls.__tablename__ in cls.__metadata__.metadata.tables:
+            existing_indexes = {
+                index.name
+                for index in cls.__metadata__.metadata.tables[cls.__tablename__].indexes
+            }
+
         cls.__metadata__.tables[name]["table"] = sqlalchemy.Table(
             name if not hasattr(cls, "__tablename__") else cls.__tablename__,
             cls.__metadata__.metadata,
             *columns,
+            *[
+                index
+                for index in cls.generate_table_indexes()
+                if index.name not in existing_indexes
+            ],
             extend_existing=cls.__tablename__ in cls.__metadata__.metadata.tables,
         )
 
         for data_base_model, field_name in link_tables:
             cls.generate_relationship_table(data_base_model, field_name)
 
+    @classmethod
+    def generate_table_indexes(cls) -> List[sqlalchemy.Index]:
+        """
+        converts `__indexes__` definitions into sqlalchemy.Index's, to be
+        included when creating the model table
+        ```
+            __indexes__ = [
+                {"columns": ["department", "salary"]},
+                {"name": "ix_employed", "columns": ["salary"], "where": "is_employed"},
+                {"name": "ix_lower_name", "expressions": ["lower(name)"], "unique": True},
+            ]
+        ```
+        """
+        indexes = []
+        foreign_keys = cls.__metadata__.tables[cls.__name__]["foreign_keys"]
+        for definition in getattr(cls, "__indexes__", []):
+            columns = definition.get("columns", [])
+            expressions = [
+                sqlalchemy.text(expression)
+                for expression in definition.get("expressions", [])
+            ]
+            if not columns and not expressions:
+                raise Exception(
+                    f"{cls.__name__}.__indexes__ entry {definition} requires columns or expressions"
+                )
+            for column in columns:
+                if column not in cls.__fields__ or column in foreign_keys:
+                    raise Exception(
+                        f"{column} in {cls.__name__}.__indexes__ is not a valid column"
+                    )
+
+            index_name = definition.get("name")
+            if not index_name:
+                if expressions:
+                    raise Exception(
+                        f"{cls.__name__}.__indexes__ entry {definition} requires a name for expressions"
+                    )
+                index_name = f"ix_{cls.__tablename__}_{'_'.join(columns)}"
+
+            partial_config = {}
+            if definition.get("where"):
+                # partial indexes are not supported by mysql, which creates
+                # a full index
+                partial_config = {
+                    "postgresql_where": sqlalchemy.text(definition["where"]),
+                    "sqlite_where": sqlalchemy.text(definition["where"]),
+                }
+
+            indexes.append(
+                sqlalchemy.Index(
+                    index_name,
+                    *columns,
+                    *expressions,
+                    unique=definition.get("unique", False),
+                    **partial_config,
+                )
+            )
+        return indexes
+
     @classmethod
     def generate_relationship_table(cls: Type[T], related_model: T, field_ref: str):
         """
@@ -625,6 +807,8 @@ class DataBaseModel(BaseModel):
                     ondelete="CASCADE",
                 ),
                 primary_key=True,
+                # lookups from related_model cannot use the primary key prefix
+                index=True,
             ),
         )
 
@@ -703,6 +887,7 @@ class DataBaseModel(BaseModel):
         name = cls.__name__
         primary_key = None
         unique_keys = set()
+        indexed_fields = set()
         array_fields = set()
         nullable_feilds = set()
 
@@ -747,6 +932,9 @@ class DataBaseModel(BaseModel):
             if "unique" in config:
                 unique_keys.add(field_property)
 
+            if config.get("index"):
+                indexed_fields.add(field_property)
+
             if (
                 "type" in config
                 and config["type"] == "array"
@@ -807,6 +995,7 @@ class DataBaseModel(BaseModel):
                     {
                         "name": field_name,
                         "type": field.type_,
+                        "outer_type": field.outer_type_,
                         "required": field.required,
                     }
                 )
@@ -877,7 +1066,9 @@ class DataBaseModel(BaseModel):
                     sqlalchemy_model,
                     serialize,
                 ) = cls.__metadata__.database.get_translated_column_type(
-                    field["type"], primary_key=field["name"] == primary_key
+                    field["type"],
+                    primary_key=field["name"] == primary_key,
+                    outer_type=field.get("outer_type"),
                 )
             else:
                 sqlalchemy_model = sqlalchemy_type_config[field["name"]]
@@ -895,7 +1086,9 @@ class DataBaseModel(BaseModel):
             if field["name"] in default_fields:
                 server_default["default"] = default_fields[field["name"]]
                 if serialize:
-                    server_default["default"] = dumps(server_default["default"])
+                    server_default["default"] = cls.serialize_value(
+                        server_default["default"]
+                    )
 
             if field["name"] in autoincr_fields:
                 server_default["autoincrement"] = autoincr_fields[field["name"]]
@@ -914,6 +1107,7 @@ class DataBaseModel(BaseModel):
                     *field_constraints.get(field["name"], []),
                     primary_key=field["name"] == primary_key,
                     unique=field["name"] in unique_keys,
+                    index=field["name"] in indexed_fields or None,
                     nullable=field["name"] in nullable_feilds
                     and field["name"] != primary_key,
                     **server_default,
@@ -1004,10 +1198,12 @@ class DataBaseModel(BaseModel):
                     ][foreign_primary_key][2]
 
                     if serialize_local:
-                        local_value = dumps(local_value)
+                        local_value = self.serialize_value(local_value)
 
                     if serialize_foreign:
-                        foreign_primary_key_value = dumps(foreign_primary_key_value)
+                        foreign_primary_key_value = self.serialize_value(
+                            foreign_primary_key_value
+                        )
 
                     link_values = {
                         f"{table_name}_{primary_key}": local_value,
@@ -1061,7 +1257,7 @@ class DataBaseModel(BaseModel):
             serialize = self.__metadata__.tables[name]["column_map"][k][2]
 
             if serialize:
-                values[k] = dumps(getattr(self, k))
+                values[k] = self.serialize_value(getattr(self, k))
                 continue
 
             values[k] = v
@@ -1101,10 +1297,6 @@ class DataBaseModel(BaseModel):
             else:
                 raise Exception(f"{cond} is not a valid column in {table}")
 
-            query_value = value
-            if cond.serialized:
-                query_value = dumps(value)
-
         for condition in conditions:
             try:
                 query = query.where(condition.condition)
@@ -1225,6 +1417,9 @@ class DataBaseModel(BaseModel):
         if not column in table.c:
             raise Exception(f"{column} is not a valid column in {table}")
 
+        if isinstance(table.c[column].type, ARRAY) and not isinstance(value, list):
+            value = [value]
+
         return DataBaseModelCondition(
             f"{value} in {column}", table.c[column].contains(value), value
         )
@@ -1257,11 +1452,14 @@ class DataBaseModel(BaseModel):
 
         sel, values = cls.where(sel, column_values)
 
+        # let the database stop at the first matching row
+        sel = select([exists(sel)])
+
         database = cls.__metadata__.database
 
         results = await database.fetch(sel, {cls.__tablename__}, values)
 
-        return bool(results)
+        return bool(results and results[0][0])
 
     @classmethod
     def deep_join(
@@ -1437,9 +1635,7 @@ class DataBaseModel(BaseModel):
                         row_result = table.columns[k].default.arg
 
                     if serialized:
-                        row_result = cls.deserialize(
-                            row_result, expected_type=expected_type
-                        )
+                        row_result = cls.deserialize(row_result)
 
                         if row_result and expected_type in {set, list, tuple}:
                             row_result = expected_type(row_result)
@@ -1467,13 +1663,10 @@ class DataBaseModel(BaseModel):
                             "column_map"
                         ][k][3]
                         row_result = result[result_ind]
-                        expected_type = cls.__metadata__.tables[f_model.__name__][
-                            "column_map"
-                        ][k][1]
 
                         if serialized:
                             row_result = (
-                                cls.deserialize(row_result, expected_type=expected_type)
+                                cls.deserialize(row_result)
                                 if not row_result is None
                                 else None
                             )
@@ -1721,17 +1914,8 @@ class DataBaseModel(BaseModel):
                     ]
                     is_array = cls.__metadata__.tables[cls.__name__]["column_map"][k][3]
                     row_result = result[result_ind]
-                    expected_type = cls.__metadata__.tables[cls.__name__]["column_map"][
-                        k
-                    ][1]
                     if serialized:
-                        if cls.__name__ == "TableMeta":
-                            expected_type = cls.__metadata__.tables[result[0]][
-                                "model"
-                            ].__name__
-                        row_result = cls.deserialize(
-                            row_result, expected_type=expected_type
-                        )
+                        row_result = cls.deserialize(row_result)
                         row_results[k] = row_result
                         decoded_results[result_key][k] = row_result
 
@@ -1758,12 +1942,9 @@ class DataBaseModel(BaseModel):
                             "column_map"
                         ][k][3]
                         row_result = result[result_ind]
-                        expected_type = cls.__metadata__.tables[f_model.__name__][
-                            "column_map"
-                        ][k][1]
                         if serialized:
                             row_result = (
-                                cls.deserialize(row_result, expected_type=expected_type)
+                                cls.deserialize(row_result)
                                 if not row_result is None
                                 else None
                             )
@@ -2049,10 +2230,42 @@ class DataBaseModel(BaseModel):
                 if k != cls.__metadata__.tables[cls.__name__]["primary_key"]:
                     raise Exception(f"Expected primary key {primary_key}=<value>")
                 p_key_condition = [getattr(cls, primary_key) == primary_key_input[k]]
+        else:
+            p_key_condition = cls.first_row_conditions(*p_key_condition)
 
         result = await cls.filter(*p_key_condition, backward_refs=backward_refs)
         return result[0] if result else None
 
+    @classmethod
+    def first_row_conditions(
+        cls, *conditions: Tuple[DataBaseModelCondition]
+    ) -> List[DataBaseModelCondition]:
+        """
+        narrows conditions on the root table to the first matching primary key,
+        so that LIMIT 1 applies before relationships are joined, rather than
+        truncating the joined rows of a single object
+        """
+        table = cls.get_table()
+        primary_key = cls.__metadata__.tables[cls.__name__]["primary_key"]
+
+        for condition in conditions:
+            if not isinstance(condition, DataBaseModelCondition) or any(
+                ref is not table for ref in find_tables(condition.condition)
+            ):
+                # conditions on related tables depend on the joins
+                return list(conditions)
+
+        sel, values = cls.where(select([table.c[primary_key]]), {}, *conditions)
+        first_row = sel.limit(1).correlate(None).scalar_subquery()
+
+        return [
+            DataBaseModelCondition(
+                f"{primary_key} == first({', '.join(str(c) for c in conditions)})",
+                table.c[primary_key] == first_row,
+                values,
+            )
+        ]
+
     @classmethod
     async def create(cls: Type[T], **kwargs) -> T:
         new_obj = cls(**kwargs)
@@ -2065,6 +2278,12 @@ class TableMeta(DataBaseModel):
     model: dict
     columns: list
 
+    @classmethod
+    def serialize_value(cls, value: Any) -> bytes:
+        # schema snapshots keep module paths so previous model types
+        # are compared by identity when checking for migrations
+        return pickle.dumps(value)
+
 
 class DatabaseInit(DataBaseModel):
     database_url: str = PrimaryKey()
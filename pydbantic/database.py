@@ -3,20 +3,22 @@ import logging
 import sqlite3
 import time
 import uuid
-from copy import deepcopy
 from pickle import dumps
-from typing import Optional
+from typing import Optional, Tuple
 
 import sqlalchemy
 from alembic import context
 from alembic.migration import MigrationContext
 from alembic.operations import Operations
 from databases import Database as _Database
+from pydantic import ValidationError
 from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex
 
 from pydbantic.cache import Redis
 from pydbantic.core import BaseMeta, DatabaseInit, DataBaseModel, TableMeta
-from pydbantic.translations import DEFAULT_TRANSLATIONS
+from pydbantic.lock import MigrationLock
+from pydbantic.translations import DEFAULT_TRANSLATIONS, NATIVE_TRANSLATIONS
 
 
 class SQLiteConnection(sqlite3.Connection):
@@ -37,6 +39,10 @@ class Database:
         testing: bool = False,
         use_alembic: bool = False,
         echo: bool = False,
+        native_types: bool = False,
+        migration_chunk_size: int = 10000,
+        online_migrations: bool = False,
+        migration_lock_lease: float = 30.0,
     ):
         self.connection_map = {}
         self.DB_URL = db_url
@@ -58,9 +64,21 @@ class Database:
             echo=echo,
         )
         self.use_alembic = use_alembic
+        self.migration_chunk_size = migration_chunk_size
+        self.online_migrations = online_migrations
+        self.migration_lock_lease = migration_lock_lease
         self.__metadata__: BaseMeta = BaseMeta()
 
         self.DEFAULT_TRANSLATIONS = DEFAULT_TRANSLATIONS
+        self.native_types = native_types
+        if self.native_types and self.db_type in NATIVE_TRANSLATIONS:
+            self.DEFAULT_TRANSLATIONS = {
+                **DEFAULT_TRANSLATIONS,
+                self.db_type: {
+                    **DEFAULT_TRANSLATIONS[self.db_type],
+                    **NATIVE_TRANSLATIONS[self.db_type],
+                },
+            }
 
         self.metadata = sqlalchemy.MetaData(self.engine)
 
@@ -103,12 +121,23 @@ class Database:
                 self.metadata = self.tables[0].__metadata__.metadata
             self.log.info(f"setup tables completed")
 
-    def get_translated_column_type(self, input_type, primary_key: bool = False):
+    def get_translated_column_type(
+        self, input_type, primary_key: bool = False, outer_type=None
+    ):
         """
         returns appropriate sqlalchemy.TYPE based on input_type, and indicate
         data should be serialized if sqlalchemy.LargeBinary is used
+
+        outer_type - the full annotation i.e List[str], preferred over input_type
+            when a translation exists for it
         """
-        if input_type in self.DEFAULT_TRANSLATIONS[self.db_type]:
+        if (
+            outer_type is not None
+            and not primary_key
+            and outer_type in self.DEFAULT_TRANSLATIONS[self.db_type]
+        ):
+            column_config = self.DEFAULT_TRANSLATIONS[self.db_type][outer_type]
+        elif input_type in self.DEFAULT_TRANSLATIONS[self.db_type]:
             column_config = self.DEFAULT_TRANSLATIONS[self.db_type][input_type]
         else:
             column_config = self.DEFAULT_TRANSLATIONS[self.db_type]["default"]
@@ -146,11 +175,16 @@ class Database:
                 "type": field.type_ if not data_base_model else data_base_model,
                 "required": field.required,
             }
-            table_fields_list.append(table_fields[field.name])
+            table_fields_list.append(
+                {**table_fields[field.name], "outer_type": field.outer_type_}
+            )
 
         table_fields["primary_key"] = table.__metadata__.tables[table.__name__][
             "primary_key"
         ]
+        table_fields["__indexes__"] = sorted(
+            index.name for index in table.get_table().indexes
+        )
 
         table_meta = self.TableMeta(
             table_name=table.__name__,
@@ -165,6 +199,108 @@ class Database:
         else:
             await table_meta.update()
 
+    def create_index(self, index: sqlalchemy.Index) -> None:
+        """
+        creates `index` on an existing table, concurrently on postgres
+        to avoid blocking writes while the index builds
+        """
+        if_not_exists = self.db_type != "MYSQL"
+        if self.db_type != "POSTGRES":
+            with self.engine.begin() as conn:
+                conn.execute(CreateIndex(index, if_not_exists=if_not_exists))
+            return
+
+        # CONCURRENTLY cannot run within a transaction
+        index.dialect_options["postgresql"]["concurrently"] = True
+        try:
+            with self.engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            ) as conn:
+                conn.execute(CreateIndex(index, if_not_exists=if_not_exists))
+        finally:
+            index.dialect_options["postgresql"]["concurrently"] = False
+
+    def drop_index(self, index_name: str, table_name: str) -> None:
+        preparer = self.engine.dialect.identifier_preparer
+        if self.db_type == "MYSQL":
+            statement = f"DROP INDEX {preparer.quote(index_name)} ON {preparer.quote(table_name)}"
+        elif self.db_type == "POSTGRES":
+            statement = (
+                f"DROP INDEX CONCURRENTLY IF EXISTS {preparer.quote(index_name)}"
+            )
+        else:
+            statement = f"DROP INDEX IF EXISTS {preparer.quote(index_name)}"
+
+        with self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            conn.execute(sqlalchemy.text(statement))
+
+    async def migrate_indexes(
+        self, table: DataBaseModel, table_meta: TableMeta
+    ) -> None:
+        """
+        creates indexes added to & drops indexes removed from `table`
+        since its `table_meta` was last stored
+        """
+        table_ref = table.get_table()
+        indexes = {index.name: index for index in table_ref.indexes}
+        previous_indexes = set(table_meta.model.get("__indexes__", []))
+
+        to_create = [
+            index for name, index in indexes.items() if not name in previous_indexes
+        ]
+        to_drop = [name for name in previous_indexes if not name in indexes]
+        if not to_create and not to_drop:
+            return
+
+        for index in to_create:
+            self.log.info(f"New Index: {index.name} in {table.__tablename__}")
+            try:
+                self.create_index(index)
+            except Exception as e:
+                self.log.warning(f"unable to create index {index.name} - {repr(e)}")
+
+        for index_name in to_drop:
+            self.log.info(f"Deleted Index: {index_name} in {table.__tablename__}")
+            try:
+                self.drop_index(index_name, table.__tablename__)
+            except Exception as e:
+                self.log.warning(f"unable to drop index {index_name} - {repr(e)}")
+
+        await self.update_table_meta(table, existing=True)
+        table.__metadata__.tables[table.__name__]["table"] = table_ref
+
+    def migrate_link_table_indexes(self) -> None:
+        """
+        creates indexes missing from existing relationship link tables,
+        i.e tables created before link table indexes were generated
+        """
+        link_tables = {}
+        for table in self.tables:
+            for link in table.__metadata__.tables[table.__name__][
+                "relationships"
+            ].values():
+                link_tables[link.link_table.name] = link.link_table
+
+        inspector = sqlalchemy.inspect(self.engine)
+        for link_table_name, link_table in link_tables.items():
+            if not inspector.has_table(link_table_name):
+                continue
+            # compared by columns, as long names are truncated by the dialect
+            existing_indexes = {
+                tuple(index["column_names"])
+                for index in inspector.get_indexes(link_table_name)
+            }
+            for index in link_table.indexes:
+                if tuple(c.name for c in index.columns) in existing_indexes:
+                    continue
+                self.log.info(f"New Index: {index.name} in {link_table_name}")
+                try:
+                    self.create_index(index)
+                except Exception as e:
+                    self.log.warning(f"unable to create index {index.name} - {repr(e)}")
+
     def add_table(self, table: DataBaseModel):
 
         if not table in self.tables:
@@ -224,40 +360,31 @@ class Database:
                 f"compare_tables_and_migrate cannot be called while using alembic"
             )
 
-        reservation = str(uuid.uuid4())
         self.metadata.create_all(self.engine)
 
-        # checkout database for migrations
-        database_init = await DatabaseInit.get(database_url=self.DB_URL)
+        # checkout database for migrations, other workers wait until released
+        async with MigrationLock(
+            self, self.DB_URL, lease=self.migration_lock_lease
+        ) as lock:
+            database_init = await DatabaseInit.get(database_url=self.DB_URL)
+            if not database_init:
+                database_init = DatabaseInit(database_url=self.DB_URL)
 
-        if not database_init:
-            database_init = DatabaseInit(
-                database_url=self.DB_URL, reservation=reservation
-            )
-        else:
-            database_init.reservation = reservation
-
-        try:
+            database_init.reservation = lock.reservation
+            database_init.status = "starting"
             await database_init.save()
-            await asyncio.sleep(3)
-            check = await DatabaseInit.get(database_url=self.DB_URL)
-            if check.reservation == reservation:
-                check.status = "starting"
-                await check.save()
 
-        except Exception as e:
-            self.log.warning(
-                f"unable to reserve database for migration - perhaps another worker is running?"
-            )
+            await self.migrate_tables()
 
-        if not database_init.reservation == reservation:
-            while database_init.status != "ready":
-                self.log.warning(
-                    f"waiting for database migration to complete - status {database_init}"
-                )
-                await asyncio.sleep(5)
-                database_init = await DatabaseInit.get(database_url=self.DB_URL)
+            database_init.reservation = lock.reservation
+            database_init.status = "ready"
+            await database_init.update()
 
+    async def migrate_tables(self) -> None:
+        """
+        compares the stored schema of each table to its model, migrating
+        tables which changed, expects the migration lock to be held
+        """
         # get list of all tables in table_metadata table
 
         if self.testing and self.cache_enabled:
@@ -386,7 +513,7 @@ class Database:
 
             # check for deleted columns
             for field in meta_tables[table.__name__].model:
-                if field == "primary_key":
+                if field in {"primary_key", "__indexes__"}:
                     continue
                 if not field in table.__fields__ and field not in aliases.values():
                     is_migration_required = True
@@ -396,6 +523,9 @@ class Database:
                     "blame": migration_blame,
                     "table": table,
                 }
+                continue
+
+            await self.migrate_indexes(table, meta_tables[table.__name__])
 
         # determine order of migrations
         # migrations should run first against foreign tables, if needed so that dependent tables
@@ -411,196 +541,685 @@ class Database:
             migration_blame = migrations_required[table.__name__]["blame"]
             self.log.info(f"Migration Required: {migration_blame}")
             # migration required - re-create table with new schema
-            to_select = [c for c in meta_tables[table.__name__].model]
+            if self.online_migrations:
+                await self.online_migrate_table(table, meta_tables[table.__name__])
+                continue
+            await self.rebuild_table(table, meta_tables[table.__name__])
 
-            # create old table , named with timestamp
-            self.metadata.remove(table.__metadata__.tables[table.__name__]["table"])
+        self.migrate_link_table_indexes()
 
-            old_table_columns = table.convert_fields_to_columns(
-                include=to_select, alias=aliases
-            )
+    async def rebuild_table(self, table: DataBaseModel, table_meta: TableMeta) -> None:
+        """
+        re-creates `table` with its current schema, copying existing rows
+        into a table named with a timestamp, which is kept as a backup, and
+        from there into the new table, rolling back if rows cannot be migrated
+        """
+        name = table.__name__
+        aliases = (
+            {column["new_name"]: column["old_name"] for column in table.__renamed__}
+            if hasattr(table, "__renamed__")
+            else {}
+        )
 
-            to_select = [
-                c
-                for c in meta_tables[table.__name__].model
-                if (c in table.__fields__ or c in aliases.values())
-            ]
+        if not "primary_key" in table_meta.model:
+            table_meta.model["primary_key"] = [*table_meta.model.keys()][0]
+
+        # this is needed for tables migrated from 1.3.X -> 1.4.X
+        [setattr(c, "identity", None) for c in table_meta.columns]
+
+        suffix = f"_{int(time.time())}"
+        migration_table = sqlalchemy.Table(
+            table.__tablename__ + suffix,
+            self.metadata,
+            *table_meta.columns,
+        )
+        migration_table.create(self.engine)
 
-            old_table = None
-            if aliases and "sqlite" in self.DB_URL:
-                self.metadata.remove(table.__metadata__.tables[table.__name__]["table"])
+        # copy rows of the existing table, which matches the previous schema
+        existing_table = sqlalchemy.table(
+            table.__tablename__,
+            *[sqlalchemy.column(c.name) for c in migration_table.c],
+        )
+        await self.copy_rows(existing_table, migration_table)
+
+        # link tables reference the table, keep their rows while it is re-created
+        inspector = sqlalchemy.inspect(self.engine)
+        link_tables = []
+        for link in table.__metadata__.tables[name]["relationships"].values():
+            link_table = link.link_table
+            if not inspector.has_table(link_table.name):
+                continue
+            link_backup = sqlalchemy.Table(
+                link_table.name + suffix,
+                self.metadata,
+                *[sqlalchemy.Column(c.name, c.type) for c in link_table.c],
+            )
+            link_backup.create(self.engine)
+            await self.copy_rows(link_table, link_backup)
+
+            self.log.info(f"dropping related link-table {link_table.name}")
+            link_table.drop(self.engine)
+            link_tables.append((link_table, link_backup))
+
+        # drop existing table
+        old_table = table.__metadata__.tables[name]["table"]
+        old_table.drop(self.engine)
+        self.metadata.remove(old_table)
+
+        # create new table with new schema
+        new_table = sqlalchemy.Table(
+            table.__tablename__,
+            self.metadata,
+            *table.convert_fields_to_columns()[0],
+            *table.generate_table_indexes(),
+        )
+        new_table.create(self.engine)
+        table.__metadata__.tables[name]["table"] = new_table
+        table.generate_model_attributes()
 
-                old_table = sqlalchemy.Table(
-                    table.__tablename__,
-                    self.metadata,
-                    *old_table_columns[0],
+        for link_table, _ in link_tables:
+            self.log.info(f"re-creating related link-table {link_table.name}")
+            link_table.create(self.engine)
+
+        try:
+            converted = await self.migrate_rows(
+                table, migration_table, new_table, aliases, table_meta.model
+            )
+            for link_table, link_backup in link_tables:
+                await self.copy_rows(link_backup, link_table)
+            if converted:
+                await self.save_relationships(table, new_table)
+        except Exception as e:
+            self.log.exception(
+                (
+                    f"Failed to migrate rows from old schema to {name} \n"
+                    f"Consider annotating non-required fields with Optional[], set a default "
+                    f"value or use factory method via Default(default=<callable>) \n\n"
+                    f"Rolling back from {migration_table.fullname} to {name}"
                 )
+            )
 
-                table.__metadata__.tables[table.__name__]["table"] = old_table
+            # trigger rollback
+            for link_table, _ in link_tables:
+                link_table.drop(self.engine)
+            new_table.drop(self.engine)
+            self.metadata.remove(new_table)
 
-            if not "primary_key" in meta_tables[table.__name__].model:
-                meta_tables[table.__name__].model["primary_key"] = [
-                    *meta_tables[table.__name__].model.keys()
-                ][0]
+            # get old columns from TableMeta
+            meta_table = await self.TableMeta.get(table_name=name)
 
-            migration_rows = await table.select(
-                *to_select,
-                alias={v: k for k, v in aliases.items()},
-                primary_key=meta_tables[table.__name__].model["primary_key"],
-                backward_refs=False,
+            rollback_table = sqlalchemy.Table(
+                table.__tablename__,
+                self.metadata,
+                *meta_table.columns,
             )
+            rollback_table.create(self.engine)
+            await self.copy_rows(migration_table, rollback_table)
 
-            # if table linked with relationship, drop link table
-            for rel, link_table in table.__metadata__.tables[table.__name__][
-                "relationships"
-            ].items():
-                self.log.info(
-                    f"dropping related link-table {link_table.link_table.name}"
+            for link_table, link_backup in link_tables:
+                link_table.create(self.engine)
+                await self.copy_rows(link_backup, link_table)
+
+            raise e
+        finally:
+            for _, link_backup in link_tables:
+                link_backup.drop(self.engine)
+                self.metadata.remove(link_backup)
+
+        # update TableMeta with new Model
+        await self.update_table_meta(table, existing=True)
+
+        table.__metadata__.tables[name]["table"] = new_table
+        table.generate_model_attributes()
+
+        self.metadata.create_all(self.engine)
+
+    async def online_migrate_table(
+        self, table: DataBaseModel, table_meta: TableMeta
+    ) -> None:
+        """
+        migrates `table` to its current schema while it remains in use - rows
+        are backfilled into a shadow table in batches, while writes to the
+        existing table are captured by triggers into a change log & replayed,
+        then the tables are swapped, keeping the existing table named with a
+        timestamp as a backup
+        """
+        name = table.__name__
+        aliases = (
+            {column["new_name"]: column["old_name"] for column in table.__renamed__}
+            if hasattr(table, "__renamed__")
+            else {}
+        )
+
+        if not "primary_key" in table_meta.model:
+            table_meta.model["primary_key"] = [*table_meta.model.keys()][0]
+
+        # this is needed for tables migrated from 1.3.X -> 1.4.X
+        [setattr(c, "identity", None) for c in table_meta.columns]
+
+        backup_name = table.__tablename__ + f"_{int(time.time())}"
+        existing_table = sqlalchemy.Table(
+            table.__tablename__, sqlalchemy.MetaData(), *table_meta.columns
+        )
+        changes = sqlalchemy.Table(
+            f"{backup_name}_changes",
+            sqlalchemy.MetaData(),
+            sqlalchemy.Column("change_id", sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column(
+                "row_key", next(iter(existing_table.primary_key.columns)).type
+            ),
+        )
+
+        # indexes are created once the shadow table replaces the existing table
+        shadow_table = sqlalchemy.Table(
+            f"{backup_name}_shadow",
+            sqlalchemy.MetaData(),
+            *table.convert_fields_to_columns()[0],
+        )
+        shadow_table.indexes.clear()
+
+        changes.create(self.engine)
+        self.create_change_triggers(existing_table, changes)
+        shadow_table.create(self.engine)
+
+        try:
+            converted = await self.migrate_rows(
+                table,
+                existing_table,
+                shadow_table,
+                aliases,
+                table_meta.model,
+                batched=True,
+            )
+
+            # catch up with writes made during the backfill
+            with self.engine.begin() as conn:
+                replayed = self.replay_changes(
+                    conn,
+                    table,
+                    existing_table,
+                    shadow_table,
+                    changes,
+                    aliases,
+                    table_meta.model,
                 )
-                try:
-                    link_table.link_table.drop(self.engine)
-                except Exception:
-                    pass
-                self.metadata.remove(link_table.link_table)
-
-            if old_table is None:
-                old_table = sqlalchemy.Table(
-                    table.__tablename__,
-                    self.metadata,
-                    *old_table_columns[0],
+
+            backup_table = existing_table.to_metadata(
+                sqlalchemy.MetaData(), name=backup_name
+            )
+            target_table = shadow_table.to_metadata(
+                sqlalchemy.MetaData(), name=table.__tablename__
+            )
+            with self.engine.begin() as conn:
+                # starts the transaction, which on sqlite also blocks other writers
+                conn.execute(changes.delete().where(changes.c.change_id <= replayed))
+
+                self.rename_tables(
+                    conn,
+                    (table.__tablename__, backup_name),
+                    (shadow_table.name, table.__tablename__),
+                )
+
+                # writes made until the swap were captured on the renamed table
+                self.replay_changes(
+                    conn,
+                    table,
+                    backup_table,
+                    target_table,
+                    changes,
+                    aliases,
+                    table_meta.model,
+                    replayed,
                 )
+                self.drop_change_triggers(conn, backup_name, changes)
+                changes.drop(conn)
 
-            table.__metadata__.tables[table.__name__]["table"] = old_table
+        except Exception as e:
+            self.log.exception(
+                f"Failed to migrate rows from old schema to {name}, {table.__tablename__} is unchanged"
+            )
+            with self.engine.begin() as conn:
+                self.drop_change_triggers(conn, table.__tablename__, changes)
+            changes.drop(self.engine, checkfirst=True)
+            shadow_table.drop(self.engine, checkfirst=True)
+            raise e
 
-            # this is needed for tables migrated from 1.3.X -> 1.4.X
-            [setattr(c, "identity", None) for c in meta_tables[table.__name__].columns]
+        self.log.info(f"Swapped {table.__tablename__} - previous rows in {backup_name}")
 
-            migration_table = sqlalchemy.Table(
-                table.__tablename__ + f"_{int(time.time())}",
-                self.metadata,
-                *meta_tables[table.__name__].columns,
+        if self.cache_enabled:
+            await self.cache.invalidate(table.__tablename__)
+
+        self.metadata.remove(table.__metadata__.tables[name]["table"])
+        new_table = sqlalchemy.Table(
+            table.__tablename__,
+            self.metadata,
+            *table.convert_fields_to_columns()[0],
+            *table.generate_table_indexes(),
+        )
+        table.__metadata__.tables[name]["table"] = new_table
+        table.generate_model_attributes()
+
+        # index names are shared with the backup table
+        inspector = sqlalchemy.inspect(self.engine)
+        for index in inspector.get_indexes(backup_name):
+            self.drop_index(index["name"], backup_name)
+        for index in new_table.indexes:
+            self.log.info(f"New Index: {index.name} in {table.__tablename__}")
+            self.create_index(index)
+
+        # link tables reference the renamed table, re-create them referencing the new table
+        for link in table.__metadata__.tables[name]["relationships"].values():
+            link_table = link.link_table
+            if not inspector.has_table(link_table.name):
+                continue
+            link_backup = sqlalchemy.Table(
+                f"{link_table.name}_{backup_name}",
+                sqlalchemy.MetaData(),
+                *[sqlalchemy.Column(c.name, c.type) for c in link_table.c],
             )
+            link_backup.create(self.engine)
+            await self.copy_rows(link_table, link_backup)
 
-            migration_table.create(self.engine)
+            self.log.info(f"re-creating related link-table {link_table.name}")
+            link_table.drop(self.engine)
+            link_table.create(self.engine)
+            await self.copy_rows(link_backup, link_table)
+            link_backup.drop(self.engine)
 
-            # read from existing table and feed into migration table
-            # selecting only previously existing columns &&
-            # columns which still exist in the current model.
+        await self.reset_autoincrement(table, new_table)
+        if converted:
+            await self.save_relationships(table, new_table)
 
-            insert_into_migration = migration_table.insert()
+        # update TableMeta with new Model
+        await self.update_table_meta(table, existing=True)
 
-            values = []
-            for row in migration_rows:
-                row_data = {}
-                for k, v in row.dict().items():
-                    row_data[k] = v
-                    if k in aliases:
-                        row_data[aliases[k]] = row_data.pop(k)
-                        continue
-                    if not k in migration_table.c:
-                        del row_data[k]
+        table.__metadata__.tables[name]["table"] = new_table
+        table.generate_model_attributes()
+
+        self.metadata.create_all(self.engine)
 
-                values.append(await row.serialize(row_data))
+    def create_change_triggers(
+        self, source: sqlalchemy.Table, changes: sqlalchemy.Table
+    ) -> None:
+        """
+        creates triggers logging the primary key of each row inserted,
+        updated or deleted in `source` into `changes`
+        """
+        preparer = self.engine.dialect.identifier_preparer
+        table_name = preparer.quote(source.name)
+        change_log = preparer.quote(changes.name)
+        key = preparer.quote(next(iter(source.primary_key.columns)).name)
+
+        if self.db_type == "POSTGRES":
+            function = preparer.quote(f"{changes.name}_capture")
+            statements = [
+                f"""CREATE FUNCTION {function}() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP <> 'INSERT' THEN
+                        INSERT INTO {change_log} (row_key) VALUES (OLD.{key});
+                    END IF;
+                    IF TG_OP <> 'DELETE' THEN
+                        INSERT INTO {change_log} (row_key) VALUES (NEW.{key});
+                    END IF;
+                    RETURN NULL;
+                END $$ LANGUAGE plpgsql""",
+                f"CREATE TRIGGER {function} AFTER INSERT OR UPDATE OR DELETE ON {table_name} "
+                f"FOR EACH ROW EXECUTE PROCEDURE {function}()",
+            ]
+        else:
+            statements = []
+            for event, values in (
+                ("INSERT", f"(NEW.{key})"),
+                ("UPDATE", f"(OLD.{key}), (NEW.{key})"),
+                ("DELETE", f"(OLD.{key})"),
+            ):
+                statement = f"INSERT INTO {change_log} (row_key) VALUES {values}"
+                if self.db_type == "SQLITE":
+                    statement = f"BEGIN {statement}; END"
+                trigger = preparer.quote(f"{changes.name}_{event.lower()}")
+                statements.append(
+                    f"CREATE TRIGGER {trigger} AFTER {event} ON {table_name} "
+                    f"FOR EACH ROW {statement}"
+                )
 
-            for query_values, links in values:
-                await self.execute(insert_into_migration, query_values)
-                try:
-                    await asyncio.gather(*links)
-                except Exception:
-                    pass
-
-            # drop existing table
-            old_config = deepcopy(table.__metadata__.tables[table.__name__])
-            old_table = old_config["table"]
-            table.__metadata__.tables[table.__name__]["table"].drop()
-            self.metadata.remove(table.__metadata__.tables[table.__name__]["table"])
-
-            # create new table with new schema
-            table.__metadata__.tables[table.__name__]["table"] = migration_table
-            new_table = sqlalchemy.Table(
-                table.__tablename__,
-                self.metadata,
-                *table.convert_fields_to_columns()[0],
+        with self.engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+
+    def drop_change_triggers(
+        self, conn, table_name: str, changes: sqlalchemy.Table
+    ) -> None:
+        preparer = self.engine.dialect.identifier_preparer
+        if self.db_type == "POSTGRES":
+            function = preparer.quote(f"{changes.name}_capture")
+            conn.exec_driver_sql(
+                f"DROP TRIGGER IF EXISTS {function} ON {preparer.quote(table_name)}"
             )
-            new_table.create(self.engine)
+            conn.exec_driver_sql(f"DROP FUNCTION IF EXISTS {function}()")
+            return
 
-            # load new table with old data, feeding from table+timestamp & default value of new row(s)
+        for event in ("insert", "update", "delete"):
+            trigger = preparer.quote(f"{changes.name}_{event}")
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    def rename_tables(self, conn, *renames: Tuple[str, str]) -> None:
+        preparer = self.engine.dialect.identifier_preparer
+        if self.db_type == "MYSQL":
+            # renames within a single statement are atomic
+            conn.exec_driver_sql(
+                "RENAME TABLE "
+                + ", ".join(
+                    f"{preparer.quote(old)} TO {preparer.quote(new)}"
+                    for old, new in renames
+                )
+            )
+            return
 
-            table.__metadata__.tables[table.__name__]["table"] = new_table
+        for old, new in renames:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {preparer.quote(old)} RENAME TO {preparer.quote(new)}"
+            )
 
-            for relationship, link_table in table.__metadata__.tables[table.__name__][
-                "relationships"
-            ].items():
-                self.log.info(
-                    f"re-creating related link-table {link_table.link_table.name}"
+    def replay_changes(
+        self,
+        conn,
+        table: DataBaseModel,
+        source: sqlalchemy.Table,
+        target: sqlalchemy.Table,
+        changes: sqlalchemy.Table,
+        aliases: dict,
+        previous_model: dict,
+        after: int = 0,
+    ) -> int:
+        """
+        re-copies rows of `source` logged in `changes` after change `after`
+        into `target`, returns the last change replayed
+        """
+        columns = self.map_columns(table, source, target, aliases, previous_model)
+        source_key = next(iter(source.primary_key.columns))
+        target_key = next(iter(target.primary_key.columns))
+
+        while True:
+            logged = conn.execute(
+                sqlalchemy.select([changes.c.change_id, changes.c.row_key])
+                .where(changes.c.change_id > after)
+                .order_by(changes.c.change_id)
+                .limit(self.migration_chunk_size)
+            ).fetchall()
+            if not logged:
+                return after
+
+            after = logged[-1][0]
+            keys = list({row[1] for row in logged})
+
+            self.log.info(f"replaying {len(logged)} changes into {target.name}")
+
+            conn.execute(target.delete().where(target_key.in_(keys)))
+            if columns is not None:
+                conn.execute(
+                    target.insert().from_select(
+                        list(columns),
+                        sqlalchemy.select(list(columns.values())).where(
+                            source_key.in_(keys)
+                        ),
+                    )
                 )
-                link_table.link_table.create()
+                continue
 
-            try:
-                for row in migration_rows:
-                    await row.insert()
-            except Exception as e:
-                self.log.exception(
-                    (
-                        f"Failed to migrate row {row} from old schema to {table.__name__} \n"
-                        f"Consider annotating non-required fields with Optional[], set a default "
-                        f"value or use factory method via Default(default=<callable>) \n\n"
-                        f"Rolling back from {migration_table.fullname} to {table.__name__}"
-                    )
+            rows = conn.execute(
+                sqlalchemy.select([source]).where(source_key.in_(keys))
+            ).fetchall()
+            if rows:
+                conn.execute(
+                    target.insert(),
+                    [
+                        self.convert_row(table, source, target, row, aliases)
+                        for row in rows
+                    ],
                 )
 
-                # trigger rollback
-                new_table.drop()
-                self.metadata.remove(new_table)
+    @staticmethod
+    def map_columns(
+        table: DataBaseModel,
+        source: sqlalchemy.Table,
+        target: sqlalchemy.Table,
+        aliases: dict,
+        previous_model: dict,
+    ) -> Optional[dict]:
+        """
+        maps columns of `target` to columns or default values of `source`, stored
+        with a `previous_model` of `table`, returns None if rows must be converted
+        through the model
+        """
+        columns = {}
+        for column in target.c:
+            source_name = (
+                column.name
+                if column.name in source.c
+                else aliases.get(column.name, column.name)
+            )
+            if source_name in source.c:
+                previous_field = previous_model.get(source_name)
+                if (
+                    not isinstance(previous_field, dict)
+                    or previous_field["type"] != table.__fields__[column.name].type_
+                    or not type(source.c[source_name].type) is type(column.type)
+                ):
+                    # modified columns are converted through the model
+                    return None
+                columns[column.name] = source.c[source_name]
+            elif column.default is not None and column.default.is_scalar:
+                columns[column.name] = sqlalchemy.literal(
+                    column.default.arg, type_=column.type
+                )
+            elif column.default is not None or not column.nullable:
+                return None
+        return columns
 
-                # get old columns from TableMeta
-                meta_table = await self.TableMeta.get(table_name=table.__name__)
+    async def migrate_rows(
+        self,
+        table: DataBaseModel,
+        source: sqlalchemy.Table,
+        target: sqlalchemy.Table,
+        aliases: dict,
+        previous_model: dict,
+        batched: bool = False,
+    ) -> bool:
+        """
+        copies rows stored in `source` with a `previous_model` of `table` into
+        `target` - within the database when each column maps directly, otherwise
+        converting the rows through the model in chunks of `migration_chunk_size`,
+        returns True if rows were converted
 
-                rollback_table = sqlalchemy.Table(
-                    table.__tablename__,
-                    self.metadata,
-                    *meta_table.columns,
+        batched - copy within the database in chunks as well
+        """
+        columns = self.map_columns(table, source, target, aliases, previous_model)
+        if columns is not None and not batched:
+            await self.copy_rows(source, target, columns)
+            await self.reset_autoincrement(table, target)
+            return False
+
+        primary_key = next(iter(source.primary_key.columns))
+        total = await self.count_rows(source)
+        insert = target.insert()
+        copied = 0
+        last_key = None
+
+        while True:
+            query = (
+                sqlalchemy.select([source] if columns is None else [primary_key])
+                .order_by(primary_key)
+                .limit(self.migration_chunk_size)
+            )
+            if last_key is not None:
+                query = query.where(primary_key > last_key)
+
+            async with self as conn:
+                async with conn.connection():
+                    rows = await conn.fetch_all(query=query)
+            if not rows:
+                break
+
+            first_key, last_key = rows[0][primary_key.name], rows[-1][primary_key.name]
+            if columns is None:
+                await self.execute_many(
+                    insert,
+                    [
+                        self.convert_row(table, source, target, row, aliases)
+                        for row in rows
+                    ],
+                )
+            else:
+                await self.execute(
+                    insert.from_select(
+                        list(columns),
+                        sqlalchemy.select(list(columns.values())).where(
+                            primary_key.between(first_key, last_key)
+                        ),
+                    )
                 )
 
-                rollback_table.create(self.engine)
+            copied += len(rows)
+            self.log.info(f"migrated {copied}/{total} rows into {target.name}")
 
-                # using existing rows that originally built
-                # previous migration table
-                rollback_rows = migration_rows
+        await self.reset_autoincrement(table, target)
+        return columns is None
 
-                insert_into_rollback = rollback_table.insert()
+    async def save_relationships(
+        self, table: DataBaseModel, target: sqlalchemy.Table
+    ) -> None:
+        """
+        saves relationships of rows converted through the model in chunks, as
+        inserting them would, creating related rows which do not exist yet
+        """
+        if not table.__metadata__.tables[table.__name__]["foreign_keys"]:
+            return
 
-                values = []
-                for row in rollback_rows:
-                    row_data = {}
-                    for k, v in row.dict().items():
-                        row_data[k] = v
-                        if k in aliases:
-                            row_data[aliases[k]] = row_data.pop(k)
-                            continue
-                        if not k in rollback_table.c:
-                            del row_data[k]
+        primary_key = table.__metadata__.tables[table.__name__]["primary_key"]
+        column = getattr(table, primary_key)
+        last_key = None
 
-                    values.append(row.serialize(row_data))
+        while True:
+            query = (
+                sqlalchemy.select([target.c[primary_key]])
+                .order_by(target.c[primary_key])
+                .limit(self.migration_chunk_size)
+            )
+            if last_key is not None:
+                query = query.where(target.c[primary_key] > last_key)
 
-                values = await asyncio.gather(*values)
+            async with self as conn:
+                async with conn.connection():
+                    keys = await conn.fetch_all(query=query)
+            if not keys:
+                break
 
-                for query_values, links in values:
-                    await self.execute(insert_into_rollback, query_values)
+            first_key, last_key = keys[0][primary_key], keys[-1][primary_key]
+            for row in await table.filter(column >= first_key, column <= last_key):
+                _, links = await row.serialize(row.dict(), insert=True)
+                await asyncio.gather(*links, return_exceptions=True)
 
-                raise e
+    @staticmethod
+    def convert_row(
+        table: DataBaseModel,
+        source: sqlalchemy.Table,
+        target: sqlalchemy.Table,
+        row,
+        aliases: dict,
+    ) -> dict:
+        """
+        converts a `row` of `source` into values for `target`, validating each
+        value against the current fields of `table`
+        """
+        column_map = table.__metadata__.tables[table.__name__]["column_map"]
+        values = {}
+        for column in target.c:
+            field = table.__fields__[column.name]
+            source_name = (
+                column.name
+                if column.name in source.c
+                else aliases.get(column.name, column.name)
+            )
 
-            # update TableMeta with new Model
-            await self.update_table_meta(table, existing=True)
+            if source_name in source.c:
+                value = row[source_name]
+                if isinstance(source.c[source_name].type, sqlalchemy.LargeBinary):
+                    value = table.deserialize(value)
+            elif column_map[column.name][4]:
+                # generated by the database
+                continue
+            elif field.required:
+                raise Exception(f"missing required value for {column.name} in {row}")
+            else:
+                value = field.get_default()
 
-            table.__metadata__.tables[table.__name__]["table"] = new_table
-            table.generate_model_attributes()
+            if value is None and not field.allow_none and not field.required:
+                value = field.get_default()
 
-            self.metadata.create_all(self.engine)
+            value, errors = field.validate(value, values, loc=column.name, cls=table)
+            if errors:
+                raise ValidationError([errors], table)
 
-        if reservation == database_init.reservation:
-            database_init.status = "ready"
-            await database_init.update()
+            if column_map[column.name][2]:
+                value = table.serialize_value(value)
+            values[column.name] = value
+
+        return values
+
+    async def copy_rows(
+        self, source, target: sqlalchemy.Table, columns: Optional[dict] = None
+    ) -> int:
+        """
+        copies rows from `source` into `target` within the database, using
+        INSERT INTO ... SELECT, `columns` maps target column names to source
+        columns or expressions, by default columns with matching names
+        """
+        if columns is None:
+            columns = {c.name: source.c[c.name] for c in target.c if c.name in source.c}
+
+        total = await self.count_rows(source)
+        await self.execute(
+            target.insert().from_select(
+                list(columns), sqlalchemy.select(list(columns.values()))
+            )
+        )
+        self.log.info(f"copied {total} rows from {source.name} into {target.name}")
+        return total
+
+    async def count_rows(self, source) -> int:
+        query = sqlalchemy.select([sqlalchemy.func.count()]).select_from(source)
+        async with self as conn:
+            async with conn.connection():
+                return await conn.fetch_val(query=query)
+
+    async def reset_autoincrement(
+        self, table: DataBaseModel, target: sqlalchemy.Table
+    ) -> None:
+        """
+        advances postgres sequences past values copied into autoincrement columns
+        """
+        if self.db_type != "POSTGRES":
+            return
+
+        column_map = table.__metadata__.tables[table.__name__]["column_map"]
+        for column in target.c:
+            if not column_map[column.name][4]:
+                continue
+            next_value = sqlalchemy.func.coalesce(sqlalchemy.func.max(column), 0) + 1
+            query = sqlalchemy.select(
+                [
+                    sqlalchemy.func.setval(
+                        sqlalchemy.func.pg_get_serial_sequence(
+                            target.name, column.name
+                        ),
+                        next_value,
+                        False,
+                    )
+                ]
+            )
+            async with self as conn:
+                async with conn.connection():
+                    await conn.execute(query=query)
 
     async def execute(self, query, values: dict = {}):
         """execute an insert, update, delete table query &
@@ -659,6 +1278,10 @@ class Database:
         testing: bool = False,
         use_alembic: bool = False,
         echo: bool = False,
+        native_types: bool = False,
+        migration_chunk_size: int = 10000,
+        online_migrations: bool = False,
+        migration_lock_lease: float = 30.0,
     ):
 
         cache_config = {"cache_enabled": cache_enabled}
@@ -673,6 +1296,10 @@ class Database:
             testing=testing,
             use_alembic=use_alembic,
             echo=echo,
+            native_types=native_types,
+            migration_chunk_size=migration_chunk_size,
+            online_migrations=online_migrations,
+            migration_lock_lease=migration_lock_lease,
             **cache_config,
         )
 
@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from typing import Optional
+
+import sqlalchemy
+
+
+class MigrationLock:
+    """
+    database wide lock held by the worker running migrations
+
+    postgres & mysql - session level advisory locks via pg_try_advisory_lock /
+        GET_LOCK, released by the database if the holding session is lost
+    sqlite - a lease on the DatabaseInit row, written within BEGIN IMMEDIATE
+        transactions & renewed until released, expiring if the holder stops
+    """
+
+    def __init__(
+        self,
+        database,
+        name: str,
+        lease: float = 30.0,
+        poll_interval: float = 0.2,
+    ):
+        self.database = database
+        self.name = name
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.holder = str(uuid.uuid4())
+
+        digest = hashlib.sha256(name.encode()).digest()
+        self.key = int.from_bytes(digest[:8], "big", signed=True)
+        self.lock_name = f"pydbantic_{digest.hex()[:40]}"
+
+        self.connection: Optional[sqlalchemy.engine.Connection] = None
+        self.heartbeat_task: Optional[asyncio.Task] = None
+
+    @property
+    def reservation(self) -> str:
+        return f"{self.holder}:{time.time() + self.lease}"
+
+    @staticmethod
+    def parse_reservation(reservation: Optional[str]):
+        """
+        returns the holder & expiration of a lease, reservations without an
+        expiration are from previous versions and considered expired
+        """
+        holder, _, expires = (reservation or "").rpartition(":")
+        try:
+            return holder, float(expires)
+        except ValueError:
+            return None, 0.0
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        started = time.time()
+        waiting = False
+        while not self.try_acquire_when_available():
+            if timeout is not None and time.time() - started > timeout:
+                raise TimeoutError(f"unable to acquire migration lock {self.name}")
+            if not waiting:
+                self.database.log.warning(
+                    f"waiting for migration lock - perhaps another worker is running migrations?"
+                )
+                waiting = True
+            await asyncio.sleep(self.poll_interval)
+
+        await self.invalidate()
+        self.heartbeat_task = asyncio.create_task(self.heartbeat())
+
+    def try_acquire_when_available(self) -> bool:
+        try:
+            return self.try_acquire()
+        except sqlalchemy.exc.OperationalError:
+            # database is busy, i.e sqlite locked by another writer
+            return False
+
+    def try_acquire(self) -> bool:
+        db_type = self.database.db_type
+        if db_type == "SQLITE":
+            return self.write_lease(acquire=True)
+
+        if self.connection is None:
+            self.connection = self.database.engine.connect()
+
+        if db_type == "POSTGRES":
+            statement = sqlalchemy.select(
+                [sqlalchemy.func.pg_try_advisory_lock(self.key)]
+            )
+        else:
+            statement = sqlalchemy.select([sqlalchemy.func.GET_LOCK(self.lock_name, 0)])
+
+        return bool(self.connection.execute(statement).scalar())
+
+    def renew(self) -> bool:
+        if self.database.db_type == "SQLITE":
+            return self.write_lease(acquire=False)
+
+        # keeps the session holding the lock alive
+        self.connection.execute(sqlalchemy.select([1]))
+        return True
+
+    async def heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not self.renew():
+                    self.database.log.error(
+                        f"migration lock {self.name} was lost, lease expired"
+                    )
+                    return
+            except Exception as e:
+                self.database.log.warning(
+                    f"unable to renew migration lock {self.name} - {repr(e)}"
+                )
+
+    async def release(self) -> None:
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+
+        if self.database.db_type == "SQLITE":
+            self.write_lease(acquire=False, release=True)
+            await self.invalidate()
+            return
+
+        if self.connection is None:
+            return
+        try:
+            if self.database.db_type == "POSTGRES":
+                statement = sqlalchemy.select(
+                    [sqlalchemy.func.pg_advisory_unlock(self.key)]
+                )
+            else:
+                statement = sqlalchemy.select(
+                    [sqlalchemy.func.RELEASE_LOCK(self.lock_name)]
+                )
+            self.connection.execute(statement)
+        finally:
+            self.connection.close()
+            self.connection = None
+
+    def write_lease(self, acquire: bool, release: bool = False) -> bool:
+        """
+        acquires, renews or releases the lease stored with the DatabaseInit row,
+        BEGIN IMMEDIATE blocks other writers between reading & writing the lease
+        """
+        table = self.database.DatabaseInit.get_table()
+        row_filter = table.c.database_url == self.database.DB_URL
+
+        with self.database.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                reservation = conn.execute(
+                    sqlalchemy.select([table.c.reservation]).where(row_filter)
+                ).fetchone()
+                holder, expires = self.parse_reservation(
+                    reservation[0] if reservation else None
+                )
+
+                if holder != self.holder and (not acquire or expires > time.time()):
+                    conn.exec_driver_sql("ROLLBACK")
+                    return False
+
+                values = {"reservation": None if release else self.reservation}
+                if reservation:
+                    conn.execute(table.update().where(row_filter).values(**values))
+                else:
+                    conn.execute(
+                        table.insert().values(
+                            database_url=self.database.DB_URL, **values
+                        )
+                    )
+            except Exception:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+
+            conn.exec_driver_sql("COMMIT")
+            return True
+
+    async def invalidate(self) -> None:
+        if self.database.cache_enabled:
+            await self.database.cache.invalidate(
+                self.database.DatabaseInit.__tablename__
+            )
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
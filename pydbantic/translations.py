@@ -1,4 +1,7 @@
+from typing import List
+
 import sqlalchemy
+from sqlalchemy.dialects import postgresql
 
 DEFAULT_TRANSLATIONS = {
     "MYSQL": {
@@ -37,3 +40,22 @@ DEFAULT_TRANSLATIONS = {
         "default": {"column_type": sqlalchemy.LargeBinary, "args": [], "kwargs": {}},
     },
 }
+
+# opt-in native column types, applied over DEFAULT_TRANSLATIONS when a
+# Database is created with native_types=True, values are stored un-pickled
+# so filtering can be done server side
+NATIVE_TRANSLATIONS = {
+    "POSTGRES": {
+        dict: {"column_type": postgresql.JSONB, "args": [], "kwargs": {}},
+        List[str]: {
+            "column_type": postgresql.ARRAY,
+            "args": [sqlalchemy.String],
+            "kwargs": {},
+        },
+        List[int]: {
+            "column_type": postgresql.ARRAY,
+            "args": [sqlalchemy.Integer],
+            "kwargs": {},
+        },
+    },
+}
@@ -0,0 +1,122 @@
+from typing import List
+
+import pytest
+import sqlalchemy
+
+from pydbantic import Database, DataBaseModel, Index, PrimaryKey
+
+
+class Tag(DataBaseModel):
+    __tablename__ = "tag"
+    tag_id: str = PrimaryKey()
+
+
+class Post(DataBaseModel):
+    __tablename__ = "post"
+    post_id: str = PrimaryKey()
+    tags: List[Tag] = []
+
+
+def get_index_names(db, table_name: str) -> set:
+    return {
+        index["name"] for index in sqlalchemy.inspect(db.engine).get_indexes(table_name)
+    }
+
+
+@pytest.mark.asyncio
+async def test_model_indexes(db_url):
+    class Worker(DataBaseModel):
+        __tablename__ = "worker"
+        __indexes__ = [
+            {"columns": ["department", "salary"]},
+            {"name": "ix_worker_paid", "columns": ["salary"], "where": "salary > 0"},
+        ]
+        worker_id: str = PrimaryKey()
+        name: str = Index()
+        department: str
+        salary: float
+
+    db = await Database.create(db_url, tables=[Worker], testing=True)
+
+    assert {
+        "ix_worker_name",
+        "ix_worker_department_salary",
+        "ix_worker_paid",
+    } <= get_index_names(db, "worker")
+
+    await Worker.create(worker_id="w1", name="joe", department="hr", salary=10.0)
+
+    # indexes added & removed from an existing table
+    class Worker(DataBaseModel):
+        __tablename__ = "worker"
+        __indexes__ = [
+            {"columns": ["department", "salary"]},
+            {"columns": ["name", "department"]},
+        ]
+        worker_id: str = PrimaryKey()
+        name: str
+        department: str
+        salary: float
+
+    db = await Database.create(db_url, tables=[Worker])
+
+    index_names = get_index_names(db, "worker")
+    assert "ix_worker_name_department" in index_names
+    assert "ix_worker_department_salary" in index_names
+    assert "ix_worker_name" not in index_names
+    assert "ix_worker_paid" not in index_names
+
+    table_meta = await db.TableMeta.get(table_name="Worker")
+    assert table_meta.model["__indexes__"] == [
+        "ix_worker_department_salary",
+        "ix_worker_name_department",
+    ]
+
+    # indexes remain after a new column is added
+    class Worker(DataBaseModel):
+        __tablename__ = "worker"
+        __indexes__ = [
+            {"columns": ["department", "salary"]},
+            {"columns": ["name", "department"]},
+        ]
+        worker_id: str = PrimaryKey()
+        name: str
+        department: str
+        salary: float
+        title: str = "staff"
+
+    db = await Database.create(db_url, tables=[Worker])
+
+    index_names = get_index_names(db, "worker")
+    assert "ix_worker_name_department" in index_names
+    assert "ix_worker_department_salary" in index_names
+
+    workers = await Worker.filter(department="hr")
+    assert workers[0].name == "joe"
+
+    db.metadata.drop_all(db.engine)
+
+
+@pytest.mark.asyncio
+async def test_model_link_table_indexes(db_url):
+    db = await Database.create(db_url, tables=[Post, Tag], testing=True)
+    assert "ix_post_to_tag_tag_tag_id" in get_index_names(db, "post_to_tag")
+
+    await Post.create(post_id="p1", tags=[Tag(tag_id="t1")])
+
+    # link tables created without the index are backfilled
+    with db.engine.begin() as conn:
+        conn.execute(
+            sqlalchemy.text(
+                "DROP INDEX ix_post_to_tag_tag_tag_id"
+                + (" ON post_to_tag" if db.db_type == "MYSQL" else "")
+            )
+        )
+
+    db = await Database.create(db_url, tables=[Post, Tag])
+    assert "ix_post_to_tag_tag_tag_id" in get_index_names(db, "post_to_tag")
+
+    post = await Post.get(post_id="p1")
+    assert post.tags[0].tag_id == "t1"
+
+    db.metadata.drop_all(db.engine)
@@ -28,6 +28,13 @@ async def test_model_many_to_many(loaded_database_and_model):
 
     assert len(manager_position.employees) == 200
 
+    # non primary key lookups limit the root row, not the joined rows
+    manager_position = await Positions.get(Positions.name == manager_position.name)
+    assert len(manager_position.employees) == 200
+
+    assert await Positions.exists(name=manager_position.name)
+    assert not await Positions.exists(name="not a position")
+
     removed_employee = manager_position.employees.pop()
 
     await manager_position.save()
@@ -0,0 +1,63 @@
+import sys
+import types
+
+import pytest
+
+from pydbantic import Database
+
+MODELS_SOURCE = """
+from pydbantic import DataBaseModel, PrimaryKey
+
+
+class Item(DataBaseModel):
+    item_id: str = PrimaryKey()
+{fields}
+"""
+
+
+def load_models(version: int, fields: str) -> types.ModuleType:
+    module_name = f"tests.item_models_{version}"
+    module = types.ModuleType(module_name)
+    sys.modules[module_name] = module
+    exec(MODELS_SOURCE.format(fields=fields), module.__dict__)
+    return module
+
+
+@pytest.mark.asyncio
+async def test_model_migration_copy(db_url):
+    models = load_models(1, "    quantity: int\n    note: str")
+    db = await Database.create(db_url, tables=[models.Item], testing=True)
+
+    for i in range(25):
+        await models.Item.create(item_id=f"item_{i:02}", quantity=i, note="old")
+
+    # deleted & defaulted columns are copied within the database
+    models = load_models(2, "    quantity: int\n    label: str = 'new'")
+    db = await Database.create(db_url, tables=[models.Item])
+
+    items = await models.Item.all()
+    assert len(items) == 25
+    assert {item.label for item in items} == {"new"}
+    assert items[3].quantity == 3
+
+    # modified columns are converted through the model in chunks
+    models = load_models(3, "    quantity: float\n    label: str = 'new'")
+    db = await Database.create(db_url, tables=[models.Item], migration_chunk_size=10)
+
+    items = await models.Item.all()
+    assert len(items) == 25
+    assert all(isinstance(item.quantity, float) for item in items)
+
+    # rows which cannot be migrated roll back to the previous schema
+    failing = load_models(4, "    quantity: float\n    owner: str")
+    with pytest.raises(Exception):
+        await Database.create(db_url, tables=[failing.Item], migration_chunk_size=10)
+
+    models = load_models(5, "    quantity: float\n    label: str = 'new'")
+    db = await Database.create(db_url, tables=[models.Item])
+
+    items = await models.Item.all()
+    assert len(items) == 25
+    assert items[24].quantity == 24.0
+
+    db.metadata.drop_all(db.engine)
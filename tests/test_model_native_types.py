@@ -0,0 +1,65 @@
+import os
+from typing import List
+
+import pytest
+import sqlalchemy
+
+from pydbantic import Database, DataBaseModel, PrimaryKey
+
+
+@pytest.mark.skipif(
+    os.environ["ENV"] != "postgres", reason="native types require postgres"
+)
+@pytest.mark.asyncio
+async def test_model_native_types(db_url):
+    class Product(DataBaseModel):
+        sku: str = PrimaryKey()
+        attributes: dict = {}
+        tags: List[str] = []
+        sizes: List[int] = []
+
+    db = await Database.create(
+        db_url, tables=[Product], native_types=True, testing=True
+    )
+
+    await Product.create(
+        sku="a1",
+        attributes={"color": "red", "weight": 5, "origin": {"city": "Boston"}},
+        tags=["sale", "new"],
+        sizes=[1, 2],
+    )
+    await Product.create(
+        sku="b2",
+        attributes={"weight": 20},
+        tags=["clearance"],
+        sizes=[3],
+    )
+
+    product = await Product.get(sku="a1")
+    assert product.attributes["origin"] == {"city": "Boston"}
+    assert product.tags == ["sale", "new"]
+
+    colored = await Product.filter(Product.attributes.has_key("color"))
+    assert [p.sku for p in colored] == ["a1"]
+
+    red = await Product.filter(Product.attributes.contains_all({"color": "red"}))
+    assert [p.sku for p in red] == ["a1"]
+
+    sale = await Product.filter(Product.tags.contains_all(["sale", "new"]))
+    assert [p.sku for p in sale] == ["a1"]
+
+    either = await Product.filter(Product.tags.overlaps(["new", "clearance"]))
+    assert len(either) == 2
+
+    boston = await Product.filter(Product.attributes.path("origin", "city") == "Boston")
+    assert [p.sku for p in boston] == ["a1"]
+
+    heavy = await Product.filter(
+        Product.attributes.path("weight", as_type=sqlalchemy.Integer) > 10
+    )
+    assert [p.sku for p in heavy] == ["b2"]
+
+    small = await Product.filter(Product.contains("sizes", 1))
+    assert [p.sku for p in small] == ["a1"]
+
+    db.metadata.drop_all(db.engine)
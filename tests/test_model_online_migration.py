@@ -0,0 +1,84 @@
+import sys
+import types
+
+import pytest
+import sqlalchemy
+
+from pydbantic import Database
+
+MODELS_SOURCE = """
+from pydbantic import DataBaseModel, PrimaryKey
+
+
+class Stock(DataBaseModel):
+    stock_id: str = PrimaryKey()
+{fields}
+"""
+
+
+def load_models(version: int, fields: str) -> types.ModuleType:
+    module_name = f"tests.stock_models_{version}"
+    module = types.ModuleType(module_name)
+    sys.modules[module_name] = module
+    exec(MODELS_SOURCE.format(fields=fields), module.__dict__)
+    return module
+
+
+@pytest.mark.asyncio
+async def test_model_online_migration(db_url):
+    models = load_models(1, "    quantity: int")
+    db = await Database.create(db_url, tables=[models.Stock], testing=True)
+
+    for i in range(25):
+        await models.Stock.create(stock_id=f"stock_{i:02}", quantity=i)
+
+    models = load_models(2, "    quantity: float\n    label: str = 'new'")
+    db = Database.create(
+        db_url,
+        tables=[models.Stock],
+        online_migrations=True,
+        migration_chunk_size=10,
+    )
+
+    # write to the existing table while rows are backfilled
+    migrate_rows = db.migrate_rows
+
+    async def migrate_rows_with_writes(*args, **kwargs):
+        converted = await migrate_rows(*args, **kwargs)
+        with db.engine.begin() as conn:
+            conn.execute(
+                sqlalchemy.text(
+                    "UPDATE Stock SET quantity = 100 WHERE stock_id = 'stock_00'"
+                )
+            )
+            conn.execute(
+                sqlalchemy.text("DELETE FROM Stock WHERE stock_id = 'stock_01'")
+            )
+            conn.execute(
+                sqlalchemy.text(
+                    "INSERT INTO Stock (stock_id, quantity) VALUES ('stock_99', 99)"
+                )
+            )
+        return converted
+
+    db.migrate_rows = migrate_rows_with_writes
+    db = await db
+
+    stocks = {stock.stock_id: stock for stock in await models.Stock.all()}
+    assert len(stocks) == 25
+    assert "stock_01" not in stocks
+    assert stocks["stock_00"].quantity == 100.0
+    assert stocks["stock_99"].quantity == 99.0
+    assert stocks["stock_02"].label == "new"
+
+    # the previous table is kept as a backup
+    table_names = sqlalchemy.inspect(db.engine).get_table_names()
+    backups = [name for name in table_names if name.startswith("Stock_")]
+    assert len(backups) == 1
+    with db.engine.connect() as conn:
+        assert (
+            conn.execute(sqlalchemy.text(f"SELECT COUNT(*) FROM {backups[0]}")).scalar()
+            == 25
+        )
+
+    db.metadata.drop_all(db.engine)
@@ -0,0 +1,65 @@
+import pickle
+import sys
+import types
+
+import pytest
+
+from pydbantic import Database
+
+MODELS_SOURCE = """
+from pydantic import BaseModel
+
+from pydbantic import DataBaseModel, PrimaryKey
+
+
+class Settings(BaseModel):
+    theme: str = "dark"
+
+
+class Account(DataBaseModel):
+    account_id: str = PrimaryKey()
+    settings: Settings = Settings()
+"""
+
+
+def load_models(module_name: str) -> types.ModuleType:
+    module = types.ModuleType(module_name)
+    sys.modules[module_name] = module
+    exec(MODELS_SOURCE, module.__dict__)
+    return module
+
+
+@pytest.mark.asyncio
+async def test_model_serialization_after_module_rename(db_url):
+    models = load_models("tests.account_models")
+    db = await Database.create(db_url, tables=[models.Account], testing=True)
+
+    await models.Account.create(
+        account_id="tagged", settings=models.Settings(theme="light")
+    )
+
+    # data stored before type tagging references the module path
+    await db.execute(
+        models.Account.get_table().insert(),
+        {
+            "account_id": "untagged",
+            "settings": pickle.dumps(models.Settings(theme="blue")),
+        },
+    )
+
+    # models moved to a new module, previous module no longer exists
+    del sys.modules["tests.account_models"]
+    models = load_models("tests.renamed_account_models")
+
+    db = await Database.create(db_url, tables=[models.Account])
+
+    account = await models.Account.get(account_id="tagged")
+    assert isinstance(account.settings, models.Settings)
+    assert account.settings.theme == "light"
+
+    account = await models.Account.get(account_id="untagged")
+    assert isinstance(account.settings, models.Settings)
+    assert account.settings.theme == "blue"
+
+    del sys.modules["tests.renamed_account_models"]
+    db.metadata.drop_all(db.engine)